@@ -7,17 +7,23 @@
 # =======================================================
 
 import os
+import re
 import sys
+import errno
 import sqlite3
+import stat
 import hashlib
+import mmap
 import subprocess
 import threading
+import queue
 import time
-import shlex
 import json
+import logging
+import logging.handlers
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
 
 # =======================================================
 # AUTO-INSTALL / SETUP
@@ -47,14 +53,30 @@ def auto_setup():
 # Watchdog for real-time filesystem watching
 try:
     from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
     from watchdog.events import FileSystemEventHandler
     WATCHDOG_AVAILABLE = True
 except ImportError:
     subprocess.run([sys.executable, "-m", "pip", "install", "watchdog"], check=True)
     from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
     from watchdog.events import FileSystemEventHandler
     WATCHDOG_AVAILABLE = True
 
+# pygit2 reads repo metadata in-process; without it we fall back to the git CLI
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
+# BLAKE3 is much faster than SHA-256 for change detection; used when installed
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
 # =======================================================
 # CONFIGURATION
 # =======================================================
@@ -63,7 +85,24 @@ BIN_DIR = BASE_DIR / "bin"
 LOG_DIR = BASE_DIR / "logs"
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "nova_index.db"
+DISPATCHER_PATH = BIN_DIR / "nova-run"
 SCAN_INTERVAL = 60  # fallback scan interval in seconds
+WATCH_DEBOUNCE = 0.2  # seconds of watcher events coalesced into one batch
+HASH_BLOCK_SIZE = 1 << 20  # 1 MiB reads; large enough for hashlib to drop the GIL
+HASH_WORKERS = 8  # files hashed concurrently during scans
+# Opt-in: mmap-hash files up to this size on 64-bit (e.g. 1 << 31). Off by default because
+# a file truncated while mapped raises SIGBUS and kills the process mid-scan
+MMAP_LIMIT = 0
+SCRIPT_EXTS = frozenset({'.sh', '.py', '.js', '.pl', '.rb'})
+BINARY_EXTS = frozenset({'.exe', '.bin'})
+# Extension -> item type for scans; anything else is 'data'
+EXT_TYPES = {**dict.fromkeys(SCRIPT_EXTS, 'script'), **dict.fromkeys(BINARY_EXTS, 'binary')}
+
+# Never descend into Nova's own output or pseudo/vendored trees
+EXCLUDE_PATHS = frozenset({str(BASE_DIR), "/proc", "/sys"})
+EXCLUDE_NAMES = frozenset({".git", "node_modules", "__pycache__"})
+# Watched with polling instead of inotify (plus any fuse.* type)
+REMOTE_FS_TYPES = frozenset({"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "fuseblk", "davfs"})
 
 # Optional central update repo URL
 UPDATE_REPO = "https://your-central-repo-url.com/nova-scripts.json"
@@ -75,8 +114,27 @@ for d in [BASE_DIR, BIN_DIR, LOG_DIR, DATA_DIR]:
 # =======================================================
 # DATABASE SETUP
 # =======================================================
+def _apply_pragmas(conn):
+    # WAL lets the CLI read while a scan writes; the rest trade fsyncs for throughput
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+
+_tls = threading.local()
+
+def _conn():
+    # One connection per thread, opened on first use and kept for the life of the process
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH)
+        _apply_pragmas(conn)
+        _tls.conn = conn
+    return conn
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = _conn()
     c = conn.cursor()
     # Items table
     c.execute('''
@@ -91,9 +149,14 @@ def init_db():
             state TEXT DEFAULT 'quarantine',
             last_run REAL,
             wrapper TEXT,
-            notes TEXT
+            notes TEXT,
+            size INTEGER
         )
     ''')
+    # Databases created before the size column existed
+    columns = [row[1] for row in c.execute("PRAGMA table_info(items)")]
+    if "size" not in columns:
+        c.execute("ALTER TABLE items ADD COLUMN size INTEGER")
     # Projects table
     c.execute('''
         CREATE TABLE IF NOT EXISTS projects (
@@ -106,131 +169,357 @@ def init_db():
         )
     ''')
     conn.commit()
-    conn.close()
 
 init_db()
 
 # =======================================================
 # UTILITY FUNCTIONS
 # =======================================================
+logger = logging.getLogger("nova")
+if not logger.handlers:
+    _log_format = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+    for _handler in (logging.handlers.TimedRotatingFileHandler(LOG_DIR / "log.txt", when="midnight"),
+                     logging.StreamHandler(sys.stdout)):
+        _handler.setFormatter(_log_format)
+        logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
 def log_event(message):
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_file = LOG_DIR / f"log_{datetime.now().strftime('%Y%m%d')}.txt"
-    with open(log_file, "a") as f:
-        f.write(f"[{ts}] {message}\n")
-    print(f"[{ts}] {message}")
+    logger.info(message)
 
 def compute_hash(path):
+    # Stored as "<algo>:<hexdigest>" so BLAKE3 and SHA-256 hashes can coexist
     try:
-        h = hashlib.sha256()
         with open(path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                h.update(chunk)
-        return h.hexdigest()
+            if hasattr(os, "posix_fadvise"):
+                # Whole-file sequential read: let the kernel read ahead aggressively
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass  # only a hint (EINVAL on some FUSE/overlay mounts)
+            if BLAKE3_AVAILABLE:
+                return "b3:" + blake3_file(f, path)
+            return "s256:" + sha256_file(f)
     except Exception:
         return None
 
-def safe_exec(command, work_dir=None, timeout=60, log_file=None):
+def use_mmap(f):
+    # MMAP_LIMIT gates every mmap hashing path; 0 (the default) disables it
+    size = os.fstat(f.fileno()).st_size
+    return 0 < size <= MMAP_LIMIT and sys.maxsize > 2**32
+
+def blake3_file(f, path):
+    h = blake3()
+    if use_mmap(f) and hasattr(h, "update_mmap"):  # older blake3 releases lack update_mmap
+        try:
+            h.update_mmap(path)
+            return h.hexdigest()
+        except OSError:
+            h = blake3()  # not mappable: start over on the read path below
+    for chunk in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+def sha256_file(f):
+    if use_mmap(f):
+        # Hash straight from the mapped pages, skipping the copy into a read buffer
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return hashlib.sha256(mm).hexdigest()
+        except (OSError, ValueError):
+            pass  # not mappable (sysfs, some FUSE mounts): use the read path below
+    if hasattr(hashlib, "file_digest"):  # Python 3.11+
+        return hashlib.file_digest(f, "sha256").hexdigest()
+    h = hashlib.sha256()
+    for chunk in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+def safe_exec(argv, work_dir=None, timeout=60, log_file=None):
+    # argv is run directly, without a /bin/sh layer; a bare string is a single program path
+    if isinstance(argv, (str, os.PathLike)):
+        argv = [str(argv)]
     env = os.environ.copy()
     if work_dir:
         env["PROJECT_ROOT"] = str(work_dir)
     log_file = log_file or (LOG_DIR / f"nova-{int(time.time())}.log")
     with open(log_file, "a") as f:
         try:
-            subprocess.run(command, shell=True, cwd=work_dir, env=env, timeout=timeout, stdout=f, stderr=f)
+            subprocess.run(argv, shell=False, cwd=work_dir, env=env, timeout=timeout, stdout=f, stderr=f)
         except subprocess.TimeoutExpired:
-            f.write(f"\nExecution timed out: {command}\n")
+            f.write(f"\nExecution timed out: {argv}\n")
         except Exception as e:
-            f.write(f"\nExecution error: {command} -> {str(e)}\n")
+            f.write(f"\nExecution error: {argv} -> {str(e)}\n")
 
 # =======================================================
 # WRAPPER CREATION
 # =======================================================
-def create_wrapper(item_path, wrapper_name=None):
-    wrapper_name = wrapper_name or Path(item_path).stem
-    wrapper_path = BIN_DIR / wrapper_name
-    wrapper_content = f"""#!/bin/bash
-# Nova Wrapper for {item_path}
-PROJECT_ROOT="{Path(item_path).parent}"
-LOG="{LOG_DIR}/{wrapper_name}.$(date +%s).log"
+def ensure_dispatcher():
+    # One generic runner for every item: nova-run <item_id> [args...]
+    # looks the item up in the DB instead of writing a wrapper file per item
+    content = f"""#!/bin/bash
+# Nova dispatcher: nova-run <item_id> [args...]
+ITEM_ID="$1"
+shift
+ITEM_PATH="$("{sys.executable}" -c 'import sqlite3, sys; row = sqlite3.connect(sys.argv[1]).execute("SELECT path FROM items WHERE id=?", (int(sys.argv[2]),)).fetchone(); print(row[0] if row else "")' "{DB_PATH}" "$ITEM_ID" 2>/dev/null)"
+if [ -z "$ITEM_PATH" ]; then
+    echo "nova-run: unknown item $ITEM_ID" >&2
+    exit 1
+fi
+NAME="$(basename "$ITEM_PATH")"
+PROJECT_ROOT="$(dirname "$ITEM_PATH")"
+LOG="{LOG_DIR}/${{NAME%.*}}.$(date +%s).log"
 cd "$PROJECT_ROOT" || exit 1
 ulimit -t 60
-bash "{item_path}" "$@" >> "$LOG" 2>&1
+bash "$ITEM_PATH" "$@" >> "$LOG" 2>&1
 echo "exit:$? run_at:$(date)" >> "$LOG"
 """
-    with open(wrapper_path, "w") as f:
-        f.write(wrapper_content)
-    os.chmod(wrapper_path, 0o755)
-    return wrapper_path
+    if not DISPATCHER_PATH.exists() or DISPATCHER_PATH.read_text() != content:
+        with open(DISPATCHER_PATH, "w") as f:
+            f.write(content)
+        os.chmod(DISPATCHER_PATH, 0o755)
+    return DISPATCHER_PATH
+
+ensure_dispatcher()
 
 # =======================================================
 # ITEM REGISTRATION
 # =======================================================
-def register_item(path, type_, repo_url=None):
-    h = compute_hash(path)
-    mtime = os.path.getmtime(path)
-    wrapper = create_wrapper(path)
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT OR REPLACE INTO items (path, type, hash, repo_url, last_modified, state, wrapper)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (str(path), type_, h, repo_url, mtime, 'approved', str(wrapper)))
+def cached_item(cursor, path, size, mtime):
+    # (hash, type, repo_url) of the stored row when the file's size and mtime are unchanged
+    cursor.execute("SELECT hash, last_modified, size, type, repo_url FROM items WHERE path=?", (str(path),))
+    row = cursor.fetchone()
+    if row and row[0] and row[1] == mtime and row[2] == size:
+        return row[0], row[3], row[4]
+    return None
+
+def register_item(path, type_, repo_url=None, force_rehash=False, st=None):
+    register_items([(path, type_, repo_url, st)], force_rehash)
+
+# Upsert rather than INSERT OR REPLACE: the row (and so the nova-run ID, last_run,
+# state, trust_score and notes) survives re-registration of the same path
+ITEM_INSERT_SQL = '''
+    INSERT INTO items (path, type, hash, repo_url, last_modified, state, wrapper, size)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        type=excluded.type,
+        hash=excluded.hash,
+        repo_url=COALESCE(excluded.repo_url, items.repo_url),
+        last_modified=excluded.last_modified,
+        wrapper=excluded.wrapper,
+        size=excluded.size
+'''
+
+def register_items(items, force_rehash=False):
+    conn = _conn()
+    register_item_batch(conn.cursor(), items, force_rehash)
     conn.commit()
-    conn.close()
-    log_event(f"Registered: {path} ({type_}) -> Wrapper: {wrapper}")
+
+def register_item_batch(cursor, items, force_rehash=False):
+    write_item_rows(cursor, hash_item_rows(cursor, items, force_rehash))
+
+def hash_item_rows(cursor, items, force_rehash=False):
+    # items: list of (path, type_, repo_url, stat_result or None); hashing runs
+    # on a thread pool. Only reads the DB, so no write lock is held meanwhile
+    stats = [item[3] or os.stat(item[0]) for item in items]
+    known = [None] * len(items)
+    if not force_rehash:
+        known = [cached_item(cursor, item[0], st.st_size, st.st_mtime) for item, st in zip(items, stats)]
+    rows = []
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as ex:
+        fresh = ex.map(compute_hash, [item[0] for item, cached in zip(items, known) if cached is None])
+        for (path, type_, repo_url, _), st, cached in zip(items, stats, known):
+            if cached is None:
+                h = next(fresh)
+            elif cached[1] == type_ and (repo_url is None or cached[2] == repo_url):
+                continue  # unchanged: leave the stored row alone
+            else:
+                h = cached[0]
+            rows.append((str(path), type_, h, repo_url, st.st_mtime, 'approved', str(DISPATCHER_PATH), st.st_size))
+    return rows
+
+def write_item_rows(cursor, rows):
+    # One executemany on the caller's transaction
+    cursor.executemany(ITEM_INSERT_SQL, rows)
+    for row in rows:
+        log_event(f"Registered: {row[0]} ({row[1]}) -> Wrapper: {row[6]}")
 
 # =======================================================
 # GIT / PROJECT DETECTION
 # =======================================================
-def scan_repo(repo_path):
-    repo_path = Path(repo_path)
-    git_dir = repo_path / ".git"
-    if not git_dir.exists():
-        return
+def repo_metadata(repo_path):
+    if PYGIT2_AVAILABLE:
+        try:
+            repo = pygit2.Repository(str(repo_path))
+        except Exception:
+            repo = None
+        if repo is not None:
+            try:
+                repo_url = repo.remotes["origin"].url
+            except Exception:
+                repo_url = None
+            try:
+                head_commit = str(repo.head.target)
+            except Exception:
+                head_commit = None
+            return repo_url, head_commit
     try:
-        cmd = f"git -C {repo_path} config --get remote.origin.url"
-        repo_url = subprocess.check_output(shlex.split(cmd), stderr=subprocess.DEVNULL).decode().strip()
+        cmd = ["git", "-C", str(repo_path), "config", "--get", "remote.origin.url"]
+        repo_url = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode().strip()
     except:
         repo_url = None
     try:
-        head_commit = subprocess.check_output(shlex.split(f"git -C {repo_path} rev-parse HEAD"), stderr=subprocess.DEVNULL).decode().strip()
+        cmd = ["git", "-C", str(repo_path), "rev-parse", "HEAD"]
+        head_commit = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode().strip()
     except:
         head_commit = None
-    conn = sqlite3.connect(DB_PATH)
+    return repo_url, head_commit
+
+def scan_repo(repo_path, force_rehash=False):
+    repo_path = Path(repo_path)
+    git_dir = repo_path / ".git"
+    if not git_dir.exists():
+        return
+    repo_url, head_commit = repo_metadata(repo_path)
+    # Scan files inside repo
+    items = []
+    for entry in _walk_fast(repo_path):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue  # FIFOs, sockets and devices: open() can block forever
+        type_ = EXT_TYPES.get(os.path.splitext(entry.name)[1], 'data')
+        items.append((entry.path, type_, repo_url, st))
+    conn = _conn()
     cursor = conn.cursor()
+    rows = hash_item_rows(cursor, items, force_rehash)
+    # Write the project and its items together so the write lock is only
+    # held for the inserts, not for the walk and hashing above
     cursor.execute('''
         INSERT OR REPLACE INTO projects (name, path, repo_url, head_commit, last_update)
         VALUES (?, ?, ?, ?, ?)
     ''', (repo_path.name, str(repo_path), repo_url, head_commit, time.time()))
+    write_item_rows(cursor, rows)
     conn.commit()
-    conn.close()
-    # Scan files inside repo
-    for root, dirs, files in os.walk(repo_path):
-        for f in files:
-            ext = Path(f).suffix
-            full_path = Path(root) / f
-            if ext in ['.sh', '.py', '.js', '.pl', '.rb']:
-                register_item(full_path, 'script', repo_url)
-            elif ext in ['.exe', '.bin']:
-                register_item(full_path, 'binary', repo_url)
-            else:
-                register_item(full_path, 'data', repo_url)
 
 # =======================================================
 # FILESYSTEM WATCHER
 # =======================================================
+def is_excluded(path):
+    # Events under BASE_DIR come from Nova itself (logs, DB); indexing them would loop
+    path = os.path.abspath(path)
+    if any(path == p or path.startswith(p + os.sep) for p in EXCLUDE_PATHS):
+        return True
+    return not EXCLUDE_NAMES.isdisjoint(path.split(os.sep))
+
 class NovaHandler(FileSystemEventHandler):
+    # Events are queued and registered in debounced batches by a worker thread,
+    # so bursts (unpacking, editor temp+rename) cost one transaction, not one per event
+    def __init__(self, debounce=WATCH_DEBOUNCE):
+        super().__init__()
+        self.debounce = debounce
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._drain, daemon=True)
+        self.worker.start()
+
     def on_created(self, event):
-        path = Path(event.src_path)
-        if path.is_file():
-            ext = path.suffix
-            type_ = 'script' if ext in ['.sh', '.py', '.js', '.pl', '.rb'] else 'binary'
-            register_item(path, type_)
-        elif path.is_dir():
-            if (path / ".git").exists():
-                log_event(f"Detected new repo: {path}")
-                scan_repo(path)
+        path = os.path.abspath(event.src_path)
+        if is_excluded(path):
+            return
+        self.queue.put((path, time.time()))
+
+    def stop(self):
+        # Flush what is already queued, then end the worker thread
+        self.queue.put(None)
+        self.worker.join()
+
+    def _drain(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            path, first_seen = event
+            batch = {path: None}  # dict keeps arrival order and dedupes by path
+            deadline = first_seen + self.debounce
+            stopping = False
+            while True:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch[event[0]] = None
+            try:
+                self.register_batch(list(batch))
+            except Exception as e:
+                log_event(f"Watcher batch failed: {e}")
+            if stopping:
+                return
+
+    def register_batch(self, paths):
+        items = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                ext = os.path.splitext(path)[1]
+                type_ = 'script' if ext in SCRIPT_EXTS else 'binary'
+                items.append((path, type_, None, st))
+            elif stat.S_ISDIR(st.st_mode):
+                if os.path.exists(os.path.join(path, ".git")):
+                    log_event(f"Detected new repo: {path}")
+                    scan_repo(path)
+        if items:
+            register_items(items)
+
+def mount_fstype(path):
+    # Filesystem type of the mount containing path, from /proc/mounts (None if unknown)
+    path = os.path.realpath(path)
+    best, fstype = "", None
+    try:
+        with open("/proc/mounts") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mnt = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+                if (path == mnt or path.startswith(mnt.rstrip("/") + "/")) and len(mnt) > len(best):
+                    best, fstype = mnt, fields[2]
+    except OSError:
+        return None
+    return fstype
+
+def is_remote_fs(path):
+    fstype = mount_fstype(path) or ""
+    return fstype in REMOTE_FS_TYPES or fstype.startswith("fuse.")
+
+def start_observer(event_handler, dirs, polling=False):
+    observer = PollingObserver(timeout=SCAN_INTERVAL) if polling else Observer()
+    for d in dirs:
+        # Absolute paths so events (and the rows they produce) never carry relative paths
+        observer.schedule(event_handler, os.path.abspath(d), recursive=True)
+    try:
+        observer.start()
+    except OSError as e:
+        if polling or e.errno not in (errno.ENOSPC, errno.EMFILE):
+            raise
+        # Out of inotify watches/instances (fs.inotify.max_user_watches): poll instead
+        log_event(f"inotify limit reached ({e}), polling instead: {dirs}")
+        observer.stop()
+        return start_observer(event_handler, dirs, polling=True)
+    return observer
 
 def start_watcher(target_dirs=None):
     target_dirs = target_dirs or [Path.home()]
@@ -238,68 +527,88 @@ def start_watcher(target_dirs=None):
         log_event("Watchdog not installed, skipping live watcher")
         return
     event_handler = NovaHandler()
-    observer = Observer()
-    for d in target_dirs:
-        observer.schedule(event_handler, str(d), recursive=True)
-    observer.start()
-    log_event(f"Started filesystem watcher on: {target_dirs}")
+    remote = [d for d in target_dirs if is_remote_fs(d)]
+    local = [d for d in target_dirs if d not in remote]
+    observers = []
     try:
+        if local:
+            observers.append(start_observer(event_handler, local))
+        if remote:
+            log_event(f"Remote/FUSE filesystem, polling every {SCAN_INTERVAL}s: {remote}")
+            observers.append(start_observer(event_handler, remote, polling=True))
+        log_event(f"Started filesystem watcher on: {target_dirs}")
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
-        observer.stop()
-    observer.join()
+        pass
+    finally:
+        for observer in observers:
+            observer.stop()
+        for observer in observers:
+            observer.join()
+        # Observers are stopped, so no new events: let the worker flush and exit
+        event_handler.stop()
 
 # =======================================================
 # DIRECTORY SCAN
 # =======================================================
-def scan_directories(paths=None):
+def _walk_fast(root):
+    # Like os.walk, but yields the scandir DirEntry for each file so the
+    # stat() it caches is reused instead of re-statting every path
+    root = os.path.abspath(root)
+    if is_excluded(root):
+        return
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        if entry.name in EXCLUDE_NAMES or entry.path in EXCLUDE_PATHS:
+                            continue
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    else:
+                        yield entry
+        except OSError:
+            continue
+
+def scan_directories(paths=None, force_rehash=False):
     paths = paths or [Path.home()]
+    items = []
     for p in paths:
-        for root, dirs, files in os.walk(p):
-            for f in files:
-                ext = Path(f).suffix
-                full_path = Path(root) / f
-                if ext in ['.sh', '.py', '.js', '.pl', '.rb']:
-                    register_item(full_path, 'script')
-                elif ext in ['.exe', '.bin']:
-                    register_item(full_path, 'binary')
-                else:
-                    register_item(full_path, 'data')
+        for entry in _walk_fast(p):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue  # FIFOs, sockets and devices: open() can block forever
+            type_ = EXT_TYPES.get(os.path.splitext(entry.name)[1], 'data')
+            items.append((entry.path, type_, None, st))
+    register_items(items, force_rehash)
 
 # =======================================================
 # LIST REGISTERED ITEMS
 # =======================================================
 def list_registered_items():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, path FROM items ORDER BY id")
-    rows = cursor.fetchall()
-    conn.close()
-    return [(r[0], r[1]) for r in rows]
+    # Yields (id, path) rows as SQLite produces them; wrap in list() if needed
+    conn = _conn()
+    for row in conn.execute("SELECT id, path FROM items ORDER BY id"):
+        yield row[0], row[1]
 
 # =======================================================
 # RUN ITEM
 # =======================================================
 def nova_run(item_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT wrapper FROM items WHERE id=?", (item_id,))
-    result = cursor.fetchone()
-    conn.close()
+    conn = _conn()
+    result = conn.execute("SELECT 1 FROM items WHERE id=?", (item_id,)).fetchone()
     if result:
-        wrapper_path = result[0]
-        log_event(f"
-
-
-        log_event(f"Executing item {item_id} with wrapper {wrapper_path}")
-        safe_exec(wrapper_path)
+        log_event(f"Executing item {item_id} with wrapper {DISPATCHER_PATH}")
+        safe_exec([str(DISPATCHER_PATH), str(item_id)])
         # Update last_run timestamp
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("UPDATE items SET last_run=? WHERE id=?", (time.time(), item_id))
+        conn.execute("UPDATE items SET last_run=? WHERE id=?", (time.time(), item_id))
         conn.commit()
-        conn.close()
     else:
         log_event(f"Item ID {item_id} not found in database")
         # =======================================================
@@ -326,7 +635,7 @@ def show_info():
     # =======================================================
 # INTERACTIVE CLI
 # =======================================================
-def main_cli():
+def main_cli(force_rehash=False):
     while True:
         print("\n=== Nova Protocol & Automation Layer v1.4 ===")
         print("1) Scan directories")
@@ -340,9 +649,9 @@ def main_cli():
         if choice == "1":
             target = input("Enter directory to scan (or leave blank for HOME): ").strip()
             if target:
-                scan_directories([Path(target)])
+                scan_directories([Path(target)], force_rehash)
             else:
-                scan_directories()
+                scan_directories(force_rehash=force_rehash)
         elif choice == "2":
             target = input("Enter directory to watch (or leave blank for HOME): ").strip()
             if target:
@@ -350,12 +659,12 @@ def main_cli():
             else:
                 start_watcher()
         elif choice == "3":
-            items = list_registered_items()
-            if not items:
+            count = 0
+            for item_id, path in list_registered_items():
+                print(f"[{item_id}] {path}")
+                count += 1
+            if not count:
                 print("No items registered yet.")
-            else:
-                for item_id, path in items:
-                    print(f"[{item_id}] {path}")
         elif choice == "4":
             item_id = input("Enter item ID to run: ").strip()
             if item_id.isdigit():
@@ -372,5 +681,6 @@ def main_cli():
 
 if __name__ == "__main__":
     show_info()
-    main_cli()
+    # --force-rehash: ignore cached hashes and re-read every file (integrity audit)
+    main_cli(force_rehash="--force-rehash" in sys.argv[1:])
         